@@ -1,20 +1,30 @@
-import pandas as pd
+import json
+from pathlib import Path
 
-import scripts.plot_power_flow as ppf
-import plotly.graph_objects as go
-import pypsa
 from dash import Dash, dcc, html, Input, Output
 import dash_bootstrap_components as dbc
 
+from scripts.snapshot_figure import FIGURE_PATH, NETWORK_PATH, show_snapshot
+
+
+def load_figure(figure_path: Path = FIGURE_PATH, network_path: Path = NETWORK_PATH) -> dict:
+    """The figure precomputed by `scripts/build_figure.py`, so serving the app never imports
+    the computation stack (pypsa, pyproj, pandas). Deployments build it ahead of time
+    (see `Dockerfile`); it's only (re)built here if missing or older than the network."""
+    if not figure_path.exists() or (
+            network_path.exists() and network_path.stat().st_mtime > figure_path.stat().st_mtime):
+        from scripts.build_figure import build_figure
+        build_figure(network_path, figure_path)
+    return json.loads(figure_path.read_text())
+
+
 app = Dash(__name__, title='Copper Sushi 🍣', external_stylesheets=[dbc.themes.DARKLY])
 
 server = app.server
 
-n = pypsa.Network('networks/elec_s_all_ec_lv1.01_2H.nc')
-fig = ppf.colored_network_figure(n, 'net_power')
-fig.update_layout(
-    mapbox=dict(center=go.layout.mapbox.Center(lat=53, lon=9), zoom=3.9, pitch=60)
-)
+precomputed = load_figure()
+fig = precomputed['figure']
+snapshots = precomputed['snapshots']
 
 app.layout = html.Div([
     dcc.Graph(
@@ -26,14 +36,14 @@ app.layout = html.Div([
     html.Div(
         dcc.Slider(
             0,
-            len(n.snapshots) - 1,
+            len(snapshots) - 1,
             step=1,
             value=6,  # Use the midday snapshot by default
             marks={
                 idx: dict(
-                    label=str(snapshot.time()),
+                    label=snapshot,
                     style=dict(writingMode='vertical-rl')
-                ) for idx, snapshot in enumerate(n.snapshots)
+                ) for idx, snapshot in enumerate(snapshots)
             },
             id='snapshot-slider'
         )
@@ -44,8 +54,8 @@ app.layout = html.Div([
 @app.callback(
     Output('map', 'figure'),
     Input('snapshot-slider', 'value'))
-def update_figure(selected_snapshot_index: int) -> go.Figure:
-    figure = ppf.show_snapshot(fig, selected_snapshot_index)
+def update_figure(selected_snapshot_index: int) -> dict:
+    figure = show_snapshot(fig, selected_snapshot_index)
     return figure
 
 
@@ -0,0 +1,86 @@
+"""Opt-in compact in-memory representation of a solved PyPSA network.
+
+Float time series are downcast to float32, and repeated string columns (bus
+references, carriers, countries) become categoricals sharing one lookup table
+per kind. The bus lookup table starts with `n.buses.index`, so a bus
+reference's integer code is its position in `n.buses` (see `bus_positions`).
+
+Only those static columns are integer-coded: component indices (`n.buses.index`
+etc.) and time series columns (`n.generators_t.p.columns` etc.) stay strings,
+as PyPSA aligns static and time-varying data on them.
+
+Meant for serving and plotting; re-optimising a compacted network is not
+supported (solvers expect float64 and plain string labels).
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+import pypsa
+
+BUS_COLUMN = re.compile(r"^bus\d*$")
+LABEL_COLUMNS = ["carrier", "country"]
+
+
+def compact(n: pypsa.Network) -> pypsa.Network:
+    """Compact `n` in place; returns it for chaining."""
+    # empty components are compacted too (iterating `n.components` skips them),
+    # so they don't upcast the shared dtypes when PyPSA concatenates them,
+    # e.g. in `n.branches()`
+    components = list(n.components.values())
+
+    # one categorical dtype per kind of label, shared by every component,
+    # so e.g. lines.carrier and links.carrier concatenate without upcasting;
+    # bus labels come first, so their codes are positions in n.buses
+    kinds = {"bus": [n.buses.index]}
+    for c in components:
+        for column in c.static.columns:
+            kind = _label_kind(column)
+            if kind is not None:
+                kinds.setdefault(kind, []).append(c.static[column])
+    dtypes = {
+        kind: pd.CategoricalDtype(pd.concat([pd.Series(v) for v in values]).dropna().unique())
+        for kind, values in kinds.items()
+    }
+
+    for c in components:
+        static = c.static
+        for column in list(static.columns):
+            kind = _label_kind(column)
+            if kind is not None:
+                static[column] = static[column].astype(dtypes[kind])
+
+        for attr, df in list(c.dynamic.items()):
+            if not df.empty and (df.dtypes == np.float64).all():
+                c.dynamic[attr] = df.astype(np.float32)
+    return n
+
+
+def bus_positions(n: pypsa.Network, bus_names: pd.Series) -> np.ndarray:
+    """Integer positions of `bus_names` in `n.buses`.
+
+    On a compacted network these are the categorical codes, as long as the
+    categories still start with `n.buses.index`; after buses were added,
+    removed or reordered, falls back to looking the names up."""
+    num_buses = len(n.buses)
+    if isinstance(bus_names.dtype, pd.CategoricalDtype) \
+            and bus_names.cat.categories[:num_buses].equals(n.buses.index):
+        positions = bus_names.cat.codes.to_numpy()
+        # codes past the buses (or -1 for missing) are labels that aren't buses
+        if ((positions >= 0) & (positions < num_buses)).all():
+            return positions
+
+    positions = n.buses.index.get_indexer(bus_names)
+    unknown = bus_names[positions < 0]
+    if not unknown.empty:
+        raise KeyError(f"unknown buses: {unknown.unique().tolist()[:5]}")
+    return positions
+
+
+def _label_kind(column: str) -> str | None:
+    if BUS_COLUMN.match(column):
+        return "bus"
+    if column in LABEL_COLUMNS:
+        return column
+    return None
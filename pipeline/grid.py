@@ -10,6 +10,8 @@ from pathlib import Path
 import pandas as pd
 import pypsa
 
+from pipeline.compact import compact as compact_network
+
 OSM_PREBUILT_DIR = Path(__file__).parent.parent / "data" / "osm-prebuilt-v0.7"
 ZENODO_URL = "https://zenodo.org/records/18619025/files/{}?download=1"
 CSV_NAMES = ["buses", "lines", "links", "converters", "transformers"]
@@ -33,7 +35,7 @@ def download(data_dir: Path = OSM_PREBUILT_DIR) -> None:
             partial.replace(target)
 
 
-def build_network(data_dir: Path = OSM_PREBUILT_DIR) -> pypsa.Network:
+def build_network(data_dir: Path = OSM_PREBUILT_DIR, compact: bool = False) -> pypsa.Network:
     # geometry fields are single-quote-quoted and span multiple lines
     read = lambda name: pd.read_csv(data_dir / f"{name}.csv", index_col=0, quotechar="'")
     buses, lines, links, converters, transformers = map(read, CSV_NAMES)
@@ -94,7 +96,7 @@ def build_network(data_dir: Path = OSM_PREBUILT_DIR) -> pypsa.Network:
     for branches in (n.lines, n.links, n.transformers):
         dangling = branches[~branches.bus0.isin(n.buses.index) | ~branches.bus1.isin(n.buses.index)]
         assert dangling.empty, f"branches reference unknown buses: {dangling.index.tolist()[:5]}"
-    return n
+    return compact_network(n) if compact else n
 
 
 def cross_border(n: pypsa.Network, component: str, country0: str, country1: str) -> pd.DataFrame:
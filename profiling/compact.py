@@ -0,0 +1,86 @@
+"""Compare memory footprint and join-heavy paths of a regular vs compacted network.
+
+    PYTHONPATH=. python profiling/compact.py [network.nc]
+
+Without the solved network at hand, falls back to a synthetic one of the same
+size (3534 buses, 12 two-hourly snapshots).
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pypsa
+
+import scripts.plot_power_flow as ppf
+from pipeline.compact import compact
+from scripts.snapshot_figure import NETWORK_PATH
+
+
+def synthetic_network(num_buses: int = 3534, num_lines: int = 5600, num_links: int = 40) -> pypsa.Network:
+    rng = np.random.default_rng(0)
+    n = pypsa.Network()
+    n.set_snapshots(pd.date_range('2013-03-01', periods=12, freq='2h'))
+    carriers = ['solar', 'onwind', 'offwind-ac', 'CCGT']
+    n.add('Carrier', carriers)
+
+    buses = pd.Index([str(1000 + i) for i in range(num_buses)])
+    n.add('Bus', buses, x=rng.uniform(-10, 30, num_buses), y=rng.uniform(35, 70, num_buses),
+          country=rng.choice(['DE', 'FR', 'ES', 'IT', 'PL', 'GB'], num_buses))
+    n.add('Line', [str(i) for i in range(num_lines)], bus0=rng.choice(buses, num_lines),
+          bus1=rng.choice(buses, num_lines), x=0.1, s_nom_opt=1000)
+    n.add('Link', [f'T{i}' for i in range(num_links)], bus0=rng.choice(buses, num_links),
+          bus1=rng.choice(buses, num_links), p_nom_opt=1000)
+
+    generator_buses = buses.repeat(len(carriers))
+    generator_carriers = np.tile(carriers, num_buses)
+    generators = generator_buses + ' ' + generator_carriers
+    n.add('Generator', generators, bus=generator_buses, carrier=generator_carriers)
+    n.add('Load', buses, bus=buses)
+
+    random_t = lambda columns: pd.DataFrame(
+        rng.uniform(0, 500, (len(n.snapshots), len(columns))), n.snapshots, columns)
+    n.generators_t.p = random_t(generators)
+    n.generators_t.p_max_pu = random_t(generators) / 500
+    n.loads_t.p = random_t(buses)
+    n.buses_t.p = random_t(buses)
+    n.lines_t.p0 = random_t(n.lines.index)
+    n.links_t.p0 = random_t(n.links.index)
+    return n
+
+
+def load(path: Path) -> pypsa.Network:
+    return pypsa.Network(path) if path.exists() else synthetic_network()
+
+
+def memory_usage(n: pypsa.Network) -> int:
+    return sum(
+        df.memory_usage(deep=True).sum()
+        for c in n.components.values()
+        for df in [c.static, *c.dynamic.values()]
+    )
+
+
+def best_ms(f) -> float:
+    """Best of 5 runs of 20 calls, to filter out noise from other processes."""
+    return min(timeit.repeat(f, number=20, repeat=5)) / 20 * 1e3
+
+
+def measure(n: pypsa.Network) -> dict:
+    return dict(
+        memory_mb=memory_usage(n) / 1e6,
+        get_bus_coordinates_ms=best_ms(lambda: ppf.get_bus_coordinates(n, 'bus0')),
+        sum_generators_t_attribute_by_bus_ms=best_ms(
+            lambda: ppf.sum_generators_t_attribute_by_bus(n, n.generators_t.p)),
+    )
+
+
+if __name__ == '__main__':
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else NETWORK_PATH
+    regular = measure(load(path))
+    compacted = measure(compact(load(path)))
+
+    print(f'{"":40} {"regular":>10} {"compact":>10}')
+    for key in regular:
+        print(f'{key:40} {regular[key]:10.2f} {compacted[key]:10.2f}  ({compacted[key] / regular[key]:.0%})')
@@ -0,0 +1,39 @@
+"""Startup profile of the web entry point, based on `python -X importtime`.
+
+    PYTHONPATH=. python profiling/startup.py
+"""
+import os
+import subprocess
+import sys
+
+
+# Not in environment.yml, but Dash imports it for its Jupyter support whenever it's
+# installed (e.g. in a dev environment), adding ~0.4 s
+OPTIONAL_MODULES = ['IPython']
+
+
+def import_profile(module: str = 'app', env: dict = None, blocked: list[str] = OPTIONAL_MODULES) -> dict[str, int]:
+    """Cumulative import time in microseconds of every module imported by `module`,
+    with the `blocked` modules made unimportable, as if they weren't installed."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c',
+         f'import sys; sys.modules.update(dict.fromkeys({blocked!r})); import {module}'],
+        env={**os.environ, **(env or {})},
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    # Lines look like "import time:       123 |       4567 |   package.module"
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.removeprefix('import time:').split('|')
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+if __name__ == '__main__':
+    profile = import_profile()
+    for name, cumulative in sorted(profile.items(), key=lambda item: item[1], reverse=True)[:30]:
+        print(f'{cumulative / 1e3:10.1f} ms  {name}')
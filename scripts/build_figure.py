@@ -0,0 +1,42 @@
+"""Precompute the web app's figure offline.
+
+Building the figure needs pypsa, pyproj and pandas; the web workers only
+load the resulting JSON, so none of those are imported when serving.
+"""
+
+import json
+import os
+from pathlib import Path
+
+import plotly.graph_objects as go
+import plotly.io as pio
+import pypsa
+
+import scripts.plot_power_flow as ppf
+from pipeline.compact import compact
+from scripts.snapshot_figure import FIGURE_PATH, NETWORK_PATH
+
+
+def build_figure(network_path: Path = NETWORK_PATH, figure_path: Path = FIGURE_PATH) -> None:
+    n = pypsa.Network(network_path)
+    # Opt-in: float32 time series and categorical labels, see `pipeline.compact`
+    if os.environ.get('COPPERSUSHI_COMPACT'):
+        compact(n)
+
+    fig = ppf.colored_network_figure(n, 'net_power')
+    fig.update_layout(
+        mapbox=dict(center=go.layout.mapbox.Center(lat=53, lon=9), zoom=3.9, pitch=60)
+    )
+
+    # write to a temp path and rename atomically, so a concurrently starting
+    # web worker never reads a half-written figure
+    partial = figure_path.with_suffix(f'.{os.getpid()}.part')
+    partial.write_text(json.dumps(dict(
+        figure=json.loads(pio.to_json(fig)),
+        snapshots=[str(snapshot.time()) for snapshot in n.snapshots]
+    )))
+    partial.replace(figure_path)
+
+
+if __name__ == '__main__':
+    build_figure()
@@ -1,43 +1,47 @@
+from functools import cache
+
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.io as pio
 import pyproj
 import pypsa
 
+from pipeline.compact import bus_positions
 from scripts.network_snapshot import NetworkSnapshot
-
-# For each snapshot, a figure has 4 traces
-# (the nodes, the loaded lines, the non-loaded lines,
-# and the power flow direction arrows)
-NUM_TRACES_PER_SNAPSHOT = 4
-
-pio.templates.default = "plotly_dark"
+from scripts.snapshot_figure import NUM_TRACES_PER_SNAPSHOT, show_snapshot
 
 
 def sum_generators_t_attribute_by_bus(n: pypsa.Network, generators_t_attr: pd.DataFrame, technology: str = None) -> pd.Series:
     attribute_by_generators = generators_t_attr.filter(like=technology) if technology else generators_t_attr
 
-    # Rename generators columns to their corresponding bus names
-    # This may result with multiple columns with the same name,
-    # if multiple generators were matched on the same bus for the given technology
-    attribute_by_buses = attribute_by_generators.rename(n.generators.bus, axis='columns').\
-        rename_axis('Bus', axis='columns')
+    # Look up the bus of each generator column.
+    # Multiple generators may be matched on the same bus for the given technology
+    buses = n.generators.bus.reindex(attribute_by_generators.columns)
+    unknown = buses.index[buses.isna()]
+    if not unknown.empty:
+        raise KeyError(f'unknown generators: {unknown.tolist()[:5]}')
 
     # Group and sum by bus, in case there's multiple generators for a tech substring
     # (e.g. offwind and onwind for 'wind')
-    attribute_by_buses_sum = attribute_by_buses.groupby(by=lambda bus_name: bus_name, axis='columns').sum()
-    return attribute_by_buses_sum
+    attribute_by_buses_sum = attribute_by_generators.T.groupby(buses.to_numpy()).sum().T
+    return attribute_by_buses_sum.rename_axis('Bus', axis='columns')
 
 
 def get_bus_coordinates(n: pypsa.Network, bus_name: str) -> pd.DataFrame:
-    return n.buses.loc[n.branches()[bus_name]][['x', 'y']] \
-            .set_index(n.branches().index) \
+    branches = n.branches()
+    # Resolve bus positions once (integer codes on compact networks, see `pipeline.compact`)
+    # instead of joining on the bus name strings
+    positions = bus_positions(n, branches[bus_name])
+    return n.buses[['x', 'y']].take(positions) \
+            .set_index(branches.index) \
             .rename(dict(x=bus_name+'_x', y=bus_name+'_y'), axis='columns')
 
 
-# Mercator projection, as used by MapBox: https://docs.mapbox.com/mapbox-gl-js/example/projections/
-epsg3857 = pyproj.Proj('epsg:3857')
+@cache
+def epsg3857() -> pyproj.Proj:
+    """Mercator projection, as used by MapBox: https://docs.mapbox.com/mapbox-gl-js/example/projections/
+    Built on first use rather than at import time, since loading the projection database is slow."""
+    return pyproj.Proj('epsg:3857')
 
 
 def get_branch_midpoint(branch_info: pd.DataFrame) -> tuple[pd.Series, pd.Series]:
@@ -45,22 +49,25 @@ def get_branch_midpoint(branch_info: pd.DataFrame) -> tuple[pd.Series, pd.Series
     calculate mid-point between them,
     project mid-point back to lat/lon coordinates."""
 
-    x0, y0 = epsg3857(longitude=branch_info.bus0_x, latitude=branch_info.bus0_y)
-    x1, y1 = epsg3857(longitude=branch_info.bus1_x, latitude=branch_info.bus1_y)
+    projection = epsg3857()
+    x0, y0 = projection(longitude=branch_info.bus0_x, latitude=branch_info.bus0_y)
+    x1, y1 = projection(longitude=branch_info.bus1_x, latitude=branch_info.bus1_y)
     mid_x = (x0 + x1) / 2
     mid_y = (y0 + y1) / 2
-    mid_lon, mid_lat = epsg3857(longitude=mid_x, latitude=mid_y, inverse=True)
+    mid_lon, mid_lat = projection(longitude=mid_x, latitude=mid_y, inverse=True)
 
     return mid_lon, mid_lat
 
 
-geodesic = pyproj.Geod(ellps='WGS84')
+@cache
+def geodesic() -> pyproj.Geod:
+    return pyproj.Geod(ellps='WGS84')
 
 
 def get_branch_direction(branch_info: pd.DataFrame) -> tuple[pd.Series, pd.Series]:
     """Branch power flow direction angle (clockwise from North)"""
     [direction, inverse_direction, _] = \
-        geodesic.inv(branch_info.bus0_x, branch_info.bus0_y, branch_info.bus1_x, branch_info.bus1_y)
+        geodesic().inv(branch_info.bus0_x, branch_info.bus0_y, branch_info.bus1_x, branch_info.bus1_y)
     return direction, inverse_direction
 
 
@@ -120,7 +127,7 @@ def generators_to_html(rows: 'pd.Series[str]') -> str:
 def get_tooltip_htmls(ns: NetworkSnapshot) -> 'pd.Series[str]':
     p = round(ns.generators.p, 2).astype(str)
     p_max = round(ns.generators.p_max, 2).astype(str)
-    technologies = ns.generators.index.get_level_values(1)
+    technologies = ns.generators.index.get_level_values(1).astype(str)
     flat_generator_htmls = '<b>' + technologies + '</b>: ' + p + '/' + p_max + ' MW<br>'
     generator_htmls = flat_generator_htmls.groupby('Bus').aggregate(generators_to_html).rename('generator')
 
@@ -223,18 +230,6 @@ def get_interquartile_range(df: pd.DataFrame) -> pd.DataFrame:
     return min, max
 
 
-def show_snapshot(fig: go.Figure, snapshot_index: int) -> go.Figure:
-    active_trace_id_start = snapshot_index * NUM_TRACES_PER_SNAPSHOT
-    active_trace_id_end = active_trace_id_start + NUM_TRACES_PER_SNAPSHOT
-    for trace_id in range(len(fig.data)):
-        if trace_id in range(active_trace_id_start, active_trace_id_end):
-            fig.update_traces(dict(visible=True), selector=trace_id)
-        else:
-            fig.update_traces(dict(visible=False), selector=trace_id)
-
-    return fig
-
-
 def colored_network_figure(n: pypsa.Network, what: str, technology: str = None) -> go.Figure:
     # Create Network Graph
     fig = go.Figure(layout=go.Layout(
@@ -245,7 +240,8 @@ def colored_network_figure(n: pypsa.Network, what: str, technology: str = None)
         xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
         yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
         # This persists users' zoom between callbacks
-        uirevision=True
+        uirevision=True,
+        template='plotly_dark'
     ))
 
     snapshots = n.snapshots  # [0:1]
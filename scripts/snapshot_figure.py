@@ -0,0 +1,30 @@
+"""Snapshot switching on a precomputed figure.
+
+Kept free of heavy imports: the web app uses it on the plain-dict figure
+it loads from JSON, `plot_power_flow` on the `go.Figure` it builds.
+"""
+
+import os
+from pathlib import Path
+
+NETWORK_PATH = Path('networks/elec_s_all_ec_lv1.01_2H.nc')
+# Precomputed by `scripts/build_figure.py`; embeds the Mapbox token, so it's gitignored
+FIGURE_PATH = Path(os.environ.get('COPPERSUSHI_FIGURE', NETWORK_PATH.with_suffix('.figure.json')))
+
+# For each snapshot, a figure has 4 traces
+# (the nodes, the loaded lines, the non-loaded lines,
+# and the power flow direction arrows)
+NUM_TRACES_PER_SNAPSHOT = 4
+
+
+def show_snapshot(fig, snapshot_index: int):
+    """Make only the traces of the given snapshot visible.
+    Works on both `go.Figure`s and their plain-dict (JSON) form."""
+    active_trace_ids = range(
+        snapshot_index * NUM_TRACES_PER_SNAPSHOT,
+        (snapshot_index + 1) * NUM_TRACES_PER_SNAPSHOT
+    )
+    for trace_id, trace in enumerate(fig['data']):
+        trace['visible'] = trace_id in active_trace_ids
+
+    return fig
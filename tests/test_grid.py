@@ -39,3 +39,19 @@ def test_cross_border():
     assert grid.cross_border(n, "Line", "FR", "ES").index.tolist() == ["l1"]
     assert grid.cross_border(n, "Link", "ES", "FR").index.tolist() == ["dc1"]
     assert grid.cross_border(n, "Line", "ES", "DE").empty
+
+
+def test_build_network_compact():
+    n = grid.build_network(OSM_TINY, compact=True)
+
+    # bus references are integer-coded by their position in n.buses
+    assert (n.buses.index[n.lines.bus0.cat.codes] == n.lines.bus0.astype(str)).all()
+    assert (n.buses.index[n.links.bus1.cat.codes] == n.links.bus1.astype(str)).all()
+
+    # one lookup table per label kind, shared across components
+    assert n.lines.bus0.dtype == n.links.bus1.dtype == n.transformers.bus0.dtype
+    assert n.lines.carrier.dtype == n.links.carrier.dtype == n.buses.carrier.dtype
+    assert n.buses.loc["b1", "country"] == "ES"
+
+    assert grid.cross_border(n, "Line", "ES", "FR").index.tolist() == ["l1"]
+    assert grid.cross_border(n, "Link", "ES", "FR").index.tolist() == ["dc1"]
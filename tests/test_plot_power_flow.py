@@ -1,10 +1,15 @@
 import re
 
+import numpy as np
+import pandas as pd
 import pypsa
 import pytest
 from pytest import approx
 
 import scripts.plot_power_flow as ppf
+from pipeline import grid
+from pipeline.compact import compact
+from tests.test_grid import OSM_TINY
 
 
 class TestPlotPowerFlow:
@@ -70,3 +75,103 @@ class TestPlotPowerFlow:
         assert node_powers[first_negative_load_index] == approx(-249.45, abs=0.01)
         assert node_absolute_powers[first_negative_load_index] == approx(249.45, abs=0.01)
         assert 'Net power: -249.45 MW' in first_negative_load_tooltip
+
+
+def tiny_solved_network() -> pypsa.Network:
+    """The osm-tiny grid with generators, loads and (made-up) solved time series,
+    shaped like a PyPSA-Eur result: loads are named after their bus."""
+    n = grid.build_network(OSM_TINY)
+    n.set_snapshots(pd.date_range('2013-03-01', periods=3, freq='2h'))
+    n.add('Carrier', ['solar', 'onwind'], nice_name=['Solar', 'Onshore Wind'])
+    n.add(
+        'Generator',
+        ['b1 solar', 'b1 onwind', 'b3 onwind'],
+        bus=['b1', 'b1', 'b3'],
+        carrier=['solar', 'onwind', 'onwind'],
+        p_nom_opt=[120.5, 60.25, 80.75]
+    )
+    n.add('Load', ['b2', 'b3'], bus=['b2', 'b3'])
+
+    rng = np.random.default_rng(0)
+    random_t = lambda columns: pd.DataFrame(
+        rng.uniform(-500, 500, (len(n.snapshots), len(columns))), n.snapshots, columns)
+    n.generators_t.p = random_t(n.generators.index).abs()
+    n.generators_t.p_max_pu = random_t(['b1 solar']).abs() / 500
+    n.loads_t.p = random_t(n.loads.index).abs()
+    n.buses_t.p = random_t(n.buses.index)
+    n.lines_t.p0 = random_t(n.lines.index)
+    n.links_t.p0 = random_t(n.links.index)
+    return n
+
+
+class TestPlotPowerFlowCompact:
+    """A compacted network must plot the same as the regular one, within float32 precision."""
+
+    @pytest.fixture
+    def n(self):
+        return tiny_solved_network()
+
+    @pytest.fixture
+    def compact_n(self):
+        return compact(tiny_solved_network())
+
+    def test_compact_dtypes(self, compact_n):
+        assert compact_n.lines_t.p0.dtypes.eq('float32').all()
+        assert compact_n.generators.bus.dtype == 'category'
+
+    def test_sum_generators_t_attribute_by_bus(self, n, compact_n):
+        expected = ppf.sum_generators_t_attribute_by_bus(n, n.generators_t.p, 'wind')
+        actual = ppf.sum_generators_t_attribute_by_bus(compact_n, compact_n.generators_t.p, 'wind')
+
+        assert expected.columns.tolist() == ['b1', 'b3']
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False, rtol=1e-6)
+
+    def test_get_branch_info_for_snapshot(self, n, compact_n):
+        snapshot = n.snapshots[1]
+        expected = ppf.get_branch_info_for_snapshot(n, ppf.get_branch_info(n), snapshot)
+        actual = ppf.get_branch_info_for_snapshot(compact_n, ppf.get_branch_info(compact_n), snapshot)
+
+        pd.testing.assert_frame_equal(
+            actual.loc[expected.index], expected, check_dtype=False, rtol=1e-6)
+
+    def test_get_node_info_for_snapshot(self, n, compact_n):
+        snapshot = n.snapshots[1]
+        expected = ppf.get_node_info_for_snapshot(n, snapshot)
+        actual = ppf.get_node_info_for_snapshot(compact_n, snapshot)
+
+        pd.testing.assert_frame_equal(
+            actual[['x', 'y', 'p']], expected[['x', 'y', 'p']], check_dtype=False, rtol=1e-6)
+        assert actual.html.tolist() == expected.html.tolist()
+        assert 'Onshore Wind' in actual.html['b1']
+
+    def test_sum_generators_t_attribute_by_bus_unknown_generator(self, n):
+        # must not silently drop the columns of generators not in n.generators
+        generators_t_p = n.generators_t.p.assign(unknown=1.0)
+        with pytest.raises(KeyError):
+            ppf.sum_generators_t_attribute_by_bus(n, generators_t_p)
+
+    @pytest.mark.parametrize('compacted', [False, True])
+    @pytest.mark.parametrize('change_buses', [
+        lambda n: n.remove('Bus', 'b1'),  # an early bus, referenced by branches
+        lambda n: n.remove('Bus', 'spare'),  # not referenced by any branch
+        lambda n: n.remove('Bus', 'd2'),  # the last bus
+        lambda n: setattr(n.c['Bus'], 'static', n.buses.iloc[::-1]),
+        lambda n: n.add('Line', 'l2', bus0='d1', bus1='b3', x=0.1),
+    ])
+    def test_get_bus_coordinates_after_changing_buses(self, compacted, change_buses):
+        n = tiny_solved_network()
+        n.add('Bus', 'spare', x=9.0, y=9.0)
+        if compacted:
+            compact(n)
+        change_buses(n)
+
+        # must match looking the bus names up, or raise like it, never take the wrong bus
+        branches = n.branches()
+        for bus_name in ['bus0', 'bus1']:
+            if branches[bus_name].isin(n.buses.index).all():
+                expected = n.buses.loc[branches[bus_name].astype(str), ['x', 'y']].to_numpy()
+                actual = ppf.get_bus_coordinates(n, bus_name).to_numpy()
+                assert (actual == expected).all()
+            else:
+                with pytest.raises(KeyError):
+                    ppf.get_bus_coordinates(n, bus_name)
@@ -0,0 +1,26 @@
+import json
+
+import pytest
+
+from profiling.startup import import_profile
+
+# Only needed to compute the figure, which happens offline (`scripts/build_figure.py`).
+# (`plotly.graph_objects` isn't listed: Dash itself imports it.)
+COMPUTATION_MODULES = ['pypsa', 'pyproj', 'pandas', 'numpy', 'scripts.plot_power_flow', 'pipeline.compact']
+
+
+class TestStartup:
+    @pytest.fixture(scope='class')
+    def profile(self, tmp_path_factory):
+        figure_path = tmp_path_factory.mktemp('startup') / 'figure.json'
+        figure_path.write_text(json.dumps(dict(figure=dict(data=[], layout={}), snapshots=['00:00:00'])))
+        return import_profile('app', env=dict(COPPERSUSHI_FIGURE=str(figure_path)))
+
+    def test_app_does_not_import_computation_modules(self, profile):
+        imported = [module for module in COMPUTATION_MODULES if module in profile]
+        assert imported == []
+
+    def test_app_import_time(self, profile):
+        # Measured ~0.51 s (dash/dbc 4.4/2.0, Python 3.11, without IPython), ~0.36 s of it
+        # `import dash`; ~1.5x margin for slower runners, still catching it doubling
+        assert profile['app'] < 800_000